@@ -3,9 +3,13 @@ import random
 from vehicle_detector.detector import VehicleDetector
 
 class TrafficSignalController:
-    def __init__(self, model_name="yolov8m"):
-        # Create a vehicle detector using the specified YOLO model
-        self.detector = VehicleDetector(model_weights=f'{model_name}.pt', conf_threshold=0.4)
+    def __init__(self, model_name="yolov8m", cascade_model_name=None, audit_every=20):
+        # Create a vehicle detector using the specified YOLO model.
+        # With cascade_model_name (e.g. "yolov8n") the small model runs first
+        # and model_name is only used for ambiguous or busy directions.
+        cascade_weights = f'{cascade_model_name}.pt' if cascade_model_name else None
+        self.detector = VehicleDetector(model_weights=f'{model_name}.pt', conf_threshold=0.4,
+                                        cascade_weights=cascade_weights, audit_every=audit_every)
 
         # Folder where images are stored
         self.image_folder = os.path.join(os.path.dirname(__file__), 'data/images')
@@ -25,15 +29,18 @@ class TrafficSignalController:
         # Get 4 random images
         images = self.pick_random_images()
 
+        # Process each image
+        image_paths = [os.path.join(self.image_folder, image_name) for image_name in images]
+        return self.calculate_vehicle_counts_for_frames(image_paths)
+
+    def calculate_vehicle_counts_for_frames(self, frames):
         counts = {}           # To store vehicle counts for each direction
         annotated_images = []  # To store images with boxes drawn
 
-        # Process each image
-        for i, image_name in enumerate(images):
-            image_path = os.path.join(self.image_folder, image_name)
-
+        # Each frame is an image path or a BGR image, one per direction
+        for i, frame in enumerate(frames):
             # Detect vehicles and get count + annotated image
-            count, annotated_image, _ = self.detector.detect_and_count_with_image(image_path)
+            count, annotated_image, _ = self.detector.detect_and_count_with_image(frame)
 
             # Store count as "Direction_1", "Direction_2", etc.
             counts[f"Direction_{i+1}"] = count
@@ -59,9 +66,13 @@ class TrafficSignalController:
 
         return timings
 
-    def run_control_cycle(self):
+    def run_control_cycle(self, frames=None):
         # Step 1: Detect vehicles and get counts + images
-        counts, annotated_images = self.calculate_vehicle_counts_with_images()
+        # (random stills by default, or the given per-direction frames for replay)
+        if frames is None:
+            counts, annotated_images = self.calculate_vehicle_counts_with_images()
+        else:
+            counts, annotated_images = self.calculate_vehicle_counts_for_frames(frames)
 
         # Step 2: Decide signal timing based on vehicle counts
         timings = self.decide_signal_timing(counts)
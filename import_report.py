@@ -0,0 +1,72 @@
+import argparse
+import subprocess
+import sys
+
+# Modules main.py should only import lazily; they must not show up at startup
+DEFERRED_MODULES = ['torch', 'ultralytics', 'folium', 'streamlit_folium', 'requests', 'pandas', 'controller']
+
+def measure_import_times(module='main'):
+    """
+    Import a module in a fresh interpreter with `-X importtime`
+
+    Args:
+        module (str): Name of the module to import
+
+    Returns:
+        dict: Cumulative import time in seconds for every imported module
+    """
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{process.stderr}")
+
+    times = {}
+    for line in process.stderr.splitlines():
+        # Lines look like: "import time:  self [us] | cumulative | imported package"
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        # Keep the outermost (largest) entry for each module
+        times[name] = max(times.get(name, 0.0), int(parts[1]) / 1e6)
+
+    return times
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import time of the Streamlit app")
+    parser.add_argument('--module', default='main', help="module to import (default: main)")
+    parser.add_argument('--baseline', default='streamlit',
+                        help="module whose own imports are not blamed on --module (default: streamlit)")
+    parser.add_argument('--top', type=int, default=15, help="number of slowest modules to list")
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help="exit with an error if the total import time exceeds this")
+    args = parser.parse_args()
+
+    times = measure_import_times(args.module)
+    baseline = measure_import_times(args.baseline)
+    total = times.get(args.module, 0.0)
+    baseline_total = baseline.get(args.baseline, 0.0)
+
+    print(f"Import time of {args.module}: {total:.3f}s "
+          f"({args.baseline} alone: {baseline_total:.3f}s, {args.module} on top: {total - baseline_total:.3f}s)\n")
+    print(f"Slowest {args.top} modules (cumulative):")
+    top_level = {name: seconds for name, seconds in times.items() if '.' not in name}
+    for name, seconds in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {seconds:8.3f}s  {name}")
+
+    # Heavy modules that leaked back into the startup path; ones the baseline
+    # already imports on its own (streamlit uses requests and pandas) don't count
+    leaked = [name for name in DEFERRED_MODULES if name in times and name not in baseline]
+    if leaked:
+        print(f"\nDeferred modules imported at startup: {', '.join(leaked)}")
+
+    if leaked or (args.max_seconds is not None and total > args.max_seconds):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,66 @@
 import streamlit as st
+import os
 import time
-from controller import TrafficSignalController
-import asyncio
-import torch
-import nest_asyncio
-import folium
-from streamlit_folium import st_folium
-import json
-import pandas as pd
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from typing import Tuple, Optional
 
-# Fix for asyncio runtime error
-try:
-    nest_asyncio.apply()
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    
+# Heavy dependencies (torch/ultralytics via controller, folium, streamlit_folium,
+# requests, pandas) are imported where they are used so the first page can be
+# served without them. Run `python import_report.py` to track import time.
+
+# Set CASCADE_MODEL (e.g. "yolov8n") to run that model first and only fall back
+# to yolov8m for ambiguous or busy directions
+CASCADE_MODEL = os.environ.get("CASCADE_MODEL") or None
+
+def setup_event_loop():
+    """
+    Fix for asyncio runtime error: give the calling thread its own event loop.
+    Event loops are per thread and Streamlit reruns on new threads, so call
+    this on every run that needs it, not once per session.
+    """
+    import asyncio
+    import nest_asyncio
+
+    try:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        nest_asyncio.apply(loop)
+    except Exception as e:
+        st.error(f"Initialization error: {str(e)}")
+
+def load_controller():
+    """Import torch/ultralytics and build the traffic controller (runs in the background)"""
+    # The worker thread loads torch, so it needs its own loop too
+    setup_event_loop()
+
+    import torch
+    from controller import TrafficSignalController
+
     if torch.cuda.is_available():
         torch.cuda.init()
-except Exception as e:
-    st.error(f"Initialization error: {str(e)}")
+    return TrafficSignalController(model_name="yolov8m", cascade_model_name=CASCADE_MODEL)
+
+def start_controller_loading():
+    """Start loading this session's controller on its own worker thread"""
+    if 'controller_future' not in st.session_state:
+        executor = ThreadPoolExecutor(max_workers=1)
+        st.session_state.controller_future = executor.submit(load_controller)
+        executor.shutdown(wait=False)
+
+def get_controller():
+    """Return the session's controller, waiting for the background load if needed"""
+    setup_event_loop()
+    start_controller_loading()
+    future = st.session_state.controller_future
+    try:
+        if not future.done():
+            with st.spinner("Loading detection model..."):
+                future.result()
+        return future.result()
+    except Exception:
+        # Forget the failed load so the next rerun tries again
+        del st.session_state.controller_future
+        raise
 
 # Initialize Session State
 if 'current_direction_index' not in st.session_state:
@@ -31,8 +71,6 @@ if 'signal_data' not in st.session_state:
     st.session_state.signal_data = None
 if 'cycle_completed' not in st.session_state:
     st.session_state.cycle_completed = False
-if 'controller' not in st.session_state:
-    st.session_state.controller = TrafficSignalController(model_name="yolov8m")
 if 'auto_restart' not in st.session_state:
     st.session_state.auto_restart = False
 if 'page' not in st.session_state:
@@ -48,6 +86,8 @@ if 'map_center' not in st.session_state:
 
 def verify_intersection(lat: float, lng: float) -> Tuple[bool, Optional[str], Optional[Tuple[float, float]]]:
     """Verify if coordinates represent a 4-way intersection using Overpass API"""
+    import requests
+
     overpass_url = "http://overpass-api.de/api/interpreter"
     query = f"""
     [out:json][timeout:25];
@@ -110,6 +150,11 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
 
 def create_map():
     """Create and display the map for intersection selection"""
+    import folium
+    from streamlit_folium import st_folium
+
+    setup_event_loop()
+
     st.markdown('<p class="subtitle-text">Select a 4-way intersection on the map</p>', unsafe_allow_html=True)
     
     m = folium.Map(
@@ -247,6 +292,9 @@ def main():
             if st.button("Select Direct Mode", key="direct_mode", use_container_width=True):
                 st.session_state.page = "direct"
                 st.rerun()
+
+        # The landing page is already sent; load the model while the user picks a mode
+        start_controller_loading()
         return
 
     if st.session_state.page == "map":
@@ -272,6 +320,8 @@ def show_traffic_control_interface(show_map=False):
     """, unsafe_allow_html=True)
 
     if show_map and st.session_state.intersection_coords:
+        import pandas as pd
+
         st.sidebar.map(pd.DataFrame({
             'lat': [st.session_state.intersection_coords[0]],
             'lon': [st.session_state.intersection_coords[1]]
@@ -285,14 +335,14 @@ def show_traffic_control_interface(show_map=False):
             st.rerun()
 
     if show_map and not st.session_state.get('signal_data'):
-        run_detection(st.session_state.controller)
+        run_detection(get_controller())
     else:
         with st.container():
             col1, col2, col3 = st.columns([1, 2, 1])
             with col2:
                 if st.button("▶️ Start New Detection Cycle", use_container_width=True):
                     st.session_state.auto_restart = False
-                    run_detection(st.session_state.controller)
+                    run_detection(get_controller())
 
     if st.session_state.signal_data:
         col1, col2, col3 = st.columns([1, 2, 1])
@@ -304,11 +354,32 @@ def show_traffic_control_interface(show_map=False):
                 </div>
             """, unsafe_allow_html=True)
 
+        show_cascade_stats()
+
         placeholder = st.empty()
         with placeholder.container():
             show_current_signal_state()
             countdown_and_cycle_signals(st.session_state.signal_data['timings'])
 
+def show_cascade_stats():
+    """Show how often the model cascade needed yolov8m (only when CASCADE_MODEL is set)"""
+    future = st.session_state.get('controller_future')
+    if future is None or not future.done() or future.exception() is not None:
+        return
+
+    detector = future.result().detector
+    if detector.cascade_model is None:
+        return
+
+    stats = detector.get_cascade_stats()
+    st.sidebar.markdown(f"**Model cascade ({CASCADE_MODEL} → yolov8m)**")
+    st.sidebar.metric("Directions escalated to yolov8m", f"{stats['escalation_rate']:.0%}")
+    if stats['mean_abs_difference'] is None:
+        st.sidebar.caption("Count difference vs yolov8m: not measured yet")
+    else:
+        st.sidebar.metric("Mean count difference vs yolov8m", f"{stats['mean_abs_difference']:.2f}")
+        st.sidebar.caption(f"Max difference {stats['max_abs_difference']} over {stats['audited']} audited directions")
+
 def run_detection(controller):
     with st.status("🚦 **Processing Traffic Data**", expanded=True) as status:
         st.markdown('<p style="color: #1e293b; font-size: 16px; font-weight: 500;">📸 Capturing lane images...</p>', unsafe_allow_html=True)
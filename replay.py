@@ -0,0 +1,227 @@
+import argparse
+import math
+import re
+import time
+from pathlib import Path
+
+import cv2
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+def natural_sort_key(path):
+    # Sort "x_frame_2.jpg" before "x_frame_10.jpg"
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', path.name)]
+
+class FrameSource:
+    def __init__(self, path, fps=1.0, seek_after=60):
+        """
+        Recorded footage for one direction
+
+        Args:
+            path (str): Video file or folder of frames (e.g. from VideoFrameExtractor)
+            fps (float): Frame rate of a frame folder; videos use their own frame rate
+            seek_after (int): Seek in a video instead of stepping through it when the
+                              next frame is more than this many frames ahead
+        """
+        self.path = Path(path)
+        self.seek_after = seek_after
+        self.capture = None
+        self.frames = []
+        self.position = -1  # Index of the last frame grabbed from the video
+
+        if self.path.is_dir():
+            self.frames = sorted((p for p in self.path.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS),
+                                 key=natural_sort_key)
+            if not self.frames:
+                raise FileNotFoundError(f"No frames found in: {self.path}")
+            self.fps = fps
+        else:
+            if not self.path.exists():
+                raise FileNotFoundError(f"Video file not found: {self.path}")
+            self.capture = cv2.VideoCapture(str(self.path))
+            if not self.capture.isOpened():
+                raise Exception(f"Error opening video file: {self.path}")
+            self.fps = self.capture.get(cv2.CAP_PROP_FPS) or fps
+
+    def frame_at(self, seconds):
+        """
+        Get the frame shown at a point of simulated time
+
+        Args:
+            seconds (float): Simulated time since the start of the footage
+
+        Returns:
+            tuple: (frame, exhausted) where frame is a BGR image, or None if it
+                   could not be decoded, and exhausted is True past the end
+        """
+        index = int(seconds * self.fps)
+
+        if self.capture is None:
+            if index >= len(self.frames):
+                return None, True
+            return cv2.imread(str(self.frames[index])), False
+
+        # Far ahead (a whole signal cycle is thousands of frames): let the backend
+        # seek to the nearest keyframe and decode forward from there, instead of
+        # decoding every skipped frame here
+        if index - self.position > self.seek_after:
+            self.capture.set(cv2.CAP_PROP_POS_FRAMES, index)
+            self.position = index - 1
+
+        # Close by: step forward frame by frame. grab() still decodes each frame,
+        # it only skips the colour conversion done by retrieve()
+        while self.position < index:
+            if not self.capture.grab():
+                return None, True
+            self.position += 1
+
+        ok, frame = self.capture.retrieve()
+        return (frame if ok else None), False
+
+    def describe_frame(self, seconds):
+        # Human-readable location of the frame at a point of simulated time
+        index = int(seconds * self.fps)
+        if self.capture is None:
+            return str(self.frames[index])
+        return f"{self.path} (frame {index})"
+
+    def release(self):
+        if self.capture is not None:
+            self.capture.release()
+
+def percentile(values, fraction):
+    # Nearest-rank percentile of a list of numbers
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+def run_replay(controller, sources, max_cycles=None, duration=None):
+    """
+    Drive the controller through recorded footage on a simulated clock
+
+    Each cycle detects vehicles on the current frame of every direction, then
+    advances the clock by the full signal cycle from decide_signal_timing.
+    The replay stops when any direction runs out of footage. An undecodable
+    frame is counted as a drop and the direction's previous frame is reused.
+
+    Controller latency is timed from when every direction's frame is ready, so
+    it doesn't depend on how much footage the previous timings skipped; frame
+    acquisition (seeking and decoding) is reported separately.
+
+    Args:
+        controller (TrafficSignalController): Controller to exercise
+        sources (list): One FrameSource per direction
+        max_cycles (int): Stop after this many cycles
+        duration (float): Stop after this many simulated seconds
+
+    Returns:
+        dict: Throughput, frame drops, controller latency, frame acquisition
+              time and the per-cycle counts/timings
+    """
+    sim_time = 0.0
+    acquisition_times = []
+    latencies = []
+    cycles = []
+    dropped_frames = 0
+    last_frames = [None] * len(sources)
+
+    start = time.perf_counter()
+
+    while (max_cycles is None or len(cycles) < max_cycles) and (duration is None or sim_time < duration):
+        acquisition_start = time.perf_counter()
+
+        frames = []
+        for i, source in enumerate(sources):
+            frame, exhausted = source.frame_at(sim_time)
+            if exhausted:
+                break
+            if frame is None:
+                # Undecodable frame: count the drop and reuse the last good one
+                dropped_frames += 1
+                frame = last_frames[i]
+            if frame is None:
+                raise ValueError(f"Direction_{i+1}: could not decode its first frame "
+                                 f"({source.describe_frame(sim_time)})")
+            last_frames[i] = frame
+            frames.append(frame)
+
+        if len(frames) < len(sources):
+            break
+
+        frames_ready = time.perf_counter()
+        acquisition_times.append(frames_ready - acquisition_start)
+
+        counts, timings, _ = controller.run_control_cycle(frames)
+        latencies.append(time.perf_counter() - frames_ready)
+        cycles.append({'time': sim_time, 'counts': counts, 'timings': timings})
+
+        # Every direction gets its green before the next detection
+        sim_time += sum(timings.values())
+
+    wall_time = time.perf_counter() - start
+
+    return {
+        'cycles': len(cycles),
+        'simulated_seconds': sim_time,
+        'wall_seconds': wall_time,
+        'cycles_per_second': len(cycles) / wall_time if wall_time else 0.0,
+        'speedup': sim_time / wall_time if wall_time else 0.0,
+        'dropped_frames': dropped_frames,
+        'latency_mean': sum(latencies) / len(latencies) if latencies else 0.0,
+        'latency_p50': percentile(latencies, 0.5),
+        'latency_p95': percentile(latencies, 0.95),
+        'latency_max': max(latencies, default=0.0),
+        'acquisition_mean': sum(acquisition_times) / len(acquisition_times) if acquisition_times else 0.0,
+        'acquisition_p95': percentile(acquisition_times, 0.95),
+        'cycle_log': cycles,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded footage through the traffic controller")
+    parser.add_argument('sources', nargs='+', help="one video file or frame folder per direction, in order")
+    parser.add_argument('--fps', type=float, default=1.0, help="frame rate of frame folders (default: 1)")
+    parser.add_argument('--model', default='yolov8m', help="YOLO model name (default: yolov8m)")
+    parser.add_argument('--cascade', default=None, help="small model to run first, e.g. yolov8n")
+    parser.add_argument('--audit-every', type=int, default=20,
+                        help="also run the large model on every Nth accepted cascade frame to "
+                             "measure count drift (default: 20, 0 disables)")
+    parser.add_argument('--max-cycles', type=int, default=None, help="stop after this many cycles")
+    parser.add_argument('--duration', type=float, default=None, help="stop after this many simulated seconds")
+    args = parser.parse_args()
+
+    # Open the footage before paying for a model load
+    sources = [FrameSource(path, fps=args.fps) for path in args.sources]
+
+    from controller import TrafficSignalController
+    controller = TrafficSignalController(model_name=args.model, cascade_model_name=args.cascade,
+                                         audit_every=args.audit_every)
+
+    try:
+        report = run_replay(controller, sources, max_cycles=args.max_cycles, duration=args.duration)
+    finally:
+        for source in sources:
+            source.release()
+
+    print(f"Cycles: {report['cycles']}")
+    print(f"Simulated time: {report['simulated_seconds']:.0f}s in {report['wall_seconds']:.1f}s "
+          f"({report['speedup']:.1f}x real time)")
+    print(f"Sustained throughput: {report['cycles_per_second']:.2f} cycles/s")
+    print(f"Dropped frames: {report['dropped_frames']}")
+    print(f"Controller latency: mean {report['latency_mean'] * 1000:.0f} ms, "
+          f"p50 {report['latency_p50'] * 1000:.0f} ms, p95 {report['latency_p95'] * 1000:.0f} ms, "
+          f"max {report['latency_max'] * 1000:.0f} ms")
+    print(f"Frame acquisition: mean {report['acquisition_mean'] * 1000:.0f} ms, "
+          f"p95 {report['acquisition_p95'] * 1000:.0f} ms per cycle")
+
+    if args.cascade:
+        stats = controller.detector.get_cascade_stats()
+        print(f"Cascade escalation rate: {stats['escalation_rate']:.0%}")
+        if stats['mean_abs_difference'] is None:
+            print(f"Count difference vs {args.model}: not measured (no frames audited)")
+        else:
+            print(f"Count difference vs {args.model} ({stats['audited']} audited frames): "
+                  f"mean {stats['mean_abs_difference']:.2f}, max {stats['max_abs_difference']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import time
+
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from replay import FrameSource, percentile, run_replay
+
+
+class StubController:
+    # Counts are the frame's brightness, so tests can tell which frame was used
+    def __init__(self, green=10):
+        self.green = green
+        self.frames_seen = []
+
+    def run_control_cycle(self, frames):
+        self.frames_seen.append([int(frame[0, 0, 0]) for frame in frames])
+        counts = {f"Direction_{i+1}": int(frame[0, 0, 0]) for i, frame in enumerate(frames)}
+        timings = {direction: self.green for direction in counts}
+        return counts, timings, []
+
+
+def write_frames(folder, values, broken=()):
+    # One solid-colour frame per value; indices in broken get undecodable bytes
+    folder.mkdir()
+    for index, value in enumerate(values):
+        path = folder / f"cam_frame_{index}.png"
+        if index in broken:
+            path.write_bytes(b"not an image")
+        else:
+            cv2.imwrite(str(path), np.full((8, 8, 3), value, dtype=np.uint8))
+    return folder
+
+
+def write_video(path):
+    # 20 solid-colour frames at 5 fps with brightness 0, 10, ..., 190
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), 5.0, (16, 16))
+    if not writer.isOpened():
+        pytest.skip("no MJPG encoder available")
+    for value in range(0, 200, 10):
+        writer.write(np.full((16, 16, 3), value, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_frame_folder_is_indexed_by_time_in_natural_order(tmp_path):
+    source = FrameSource(write_frames(tmp_path / "north", range(12)), fps=2.0)
+
+    assert source.frames[10].name == "cam_frame_10.png"
+    frame, exhausted = source.frame_at(4.5)
+    assert not exhausted and frame[0, 0, 0] == 9
+    assert source.frame_at(6.0) == (None, True)
+
+
+def test_missing_footage_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        FrameSource(tmp_path / "missing.mp4")
+    (tmp_path / "empty").mkdir()
+    with pytest.raises(FileNotFoundError):
+        FrameSource(tmp_path / "empty")
+
+
+def test_video_is_read_forward_at_its_own_frame_rate(tmp_path):
+    path = write_video(tmp_path / "east.avi")
+
+    source = FrameSource(path, fps=1.0)
+    try:
+        assert source.fps == pytest.approx(5.0)
+        frame, _ = source.frame_at(2.0)
+        assert abs(int(frame[0, 0, 0]) - 100) <= 3
+        assert source.frame_at(4.0)[1] is True
+    finally:
+        source.release()
+
+
+def test_video_seeks_when_far_ahead_and_steps_when_close(tmp_path):
+    path = write_video(tmp_path / "west.avi")
+
+    source = FrameSource(path, seek_after=3)
+    try:
+        frame, _ = source.frame_at(2.0)  # 11 frames ahead: seek
+        assert abs(int(frame[0, 0, 0]) - 100) <= 3
+        frame, _ = source.frame_at(2.4)  # 2 frames ahead: step
+        assert abs(int(frame[0, 0, 0]) - 120) <= 3
+        assert source.position == 12
+        assert source.frame_at(10.0)[1] is True
+    finally:
+        source.release()
+
+
+def test_controller_latency_excludes_frame_acquisition(tmp_path):
+    class SlowSource:
+        fps = 1.0
+
+        def frame_at(self, seconds):
+            time.sleep(0.05)
+            return np.full((8, 8, 3), 1, dtype=np.uint8), False
+
+    report = run_replay(StubController(), [SlowSource()], max_cycles=3)
+
+    assert report['acquisition_mean'] >= 0.05
+    assert report['latency_max'] < 0.05
+
+
+def test_clock_advances_by_full_signal_cycle_until_footage_runs_out(tmp_path):
+    sources = [FrameSource(write_frames(tmp_path / name, range(100)), fps=1.0) for name in ("a", "b")]
+    controller = StubController(green=15)
+
+    report = run_replay(controller, sources)
+
+    # Two directions x 15s per cycle: frames 0, 30, 60, 90, then past the end
+    assert [seen[0] for seen in controller.frames_seen] == [0, 30, 60, 90]
+    assert [cycle['time'] for cycle in report['cycle_log']] == [0, 30, 60, 90]
+    assert report['cycles'] == 4
+    assert report['simulated_seconds'] == 120
+    assert report['dropped_frames'] == 0
+
+
+def test_replay_respects_max_cycles_and_duration(tmp_path):
+    source = FrameSource(write_frames(tmp_path / "a", range(100)), fps=1.0)
+
+    assert run_replay(StubController(green=10), [source], max_cycles=2)['cycles'] == 2
+    assert run_replay(StubController(green=10), [source], duration=25)['cycles'] == 3
+
+
+def test_undecodable_frame_is_dropped_and_previous_frame_reused(tmp_path):
+    good = FrameSource(write_frames(tmp_path / "a", range(40)), fps=1.0)
+    broken = FrameSource(write_frames(tmp_path / "b", range(40), broken={20}), fps=1.0)
+    controller = StubController(green=5)
+
+    report = run_replay(controller, [good, broken])
+
+    assert report['dropped_frames'] == 1
+    assert [seen[1] for seen in controller.frames_seen] == [0, 10, 10, 30]
+
+
+def test_undecodable_first_frame_names_direction_and_file(tmp_path):
+    good = FrameSource(write_frames(tmp_path / "a", range(5)), fps=1.0)
+    broken = FrameSource(write_frames(tmp_path / "b", range(5), broken={0}), fps=1.0)
+
+    with pytest.raises(ValueError, match=r"Direction_2.*cam_frame_0\.png"):
+        run_replay(StubController(), [good, broken])
+
+
+def test_percentile_uses_nearest_rank():
+    values = list(range(1, 101))
+
+    assert percentile(values, 0.95) == 95
+    assert percentile(values, 0.5) == 50
+    assert percentile(list(range(1, 21)), 0.95) == 19
+    assert percentile([7], 0.95) == 7
+    assert percentile([], 0.95) == 0.0
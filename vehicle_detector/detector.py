@@ -2,14 +2,34 @@ from ultralytics import YOLO
 import cv2
 
 class VehicleDetector:
-    def __init__(self, model_weights='yolov8m.pt', conf_threshold=0.4):
+    def __init__(self, model_weights='yolov8m.pt', conf_threshold=0.4, cascade_weights=None,
+                 ambiguity_margin=0.05, max_ambiguous=1, escalation_count=8, audit_every=20):
         # Load YOLO model for vehicle detection
         self.model = YOLO(model_weights)
         self.conf_threshold = conf_threshold
 
-    def detect_vehicles(self, image_path):
-        # Run YOLO detection on the image
-        return self.model(image_path, conf=self.conf_threshold)
+        # Optional small model (e.g. yolov8n) run first in cascade mode;
+        # the main model above is only used when the small one is unsure
+        self.cascade_model = YOLO(cascade_weights) if cascade_weights else None
+
+        # Boxes within this margin of conf_threshold could go either way; the
+        # large model is only needed when more than max_ambiguous of them
+        # (i.e. the count could be off by more than that) are in the zone
+        self.ambiguity_margin = ambiguity_margin
+        self.max_ambiguous = max_ambiguous
+
+        # Busy roads (this many vehicles or more) always go to the large model
+        self.escalation_count = escalation_count
+
+        # Every Nth non-escalated frame is also run through the large model
+        # to measure how far cascade counts drift from it (0 disables)
+        self.audit_every = audit_every
+
+        self.reset_cascade_stats()
+
+    def detect_vehicles(self, image):
+        # Run YOLO detection on the image (file path or BGR image)
+        return self.model(image, conf=self.conf_threshold)
 
     def is_point_inside_box(self, point, box):
         # Check if a given point (x, y) lies inside a given box (x1, y1, x2, y2)
@@ -17,22 +37,12 @@ class VehicleDetector:
         x1, y1, x2, y2 = box
         return x1 <= x <= x2 and y1 <= y <= y2
 
-    def detect_and_count_with_image(self, image_path):
-        # Run detection
-        results = self.detect_vehicles(image_path)
-
+    def zone_vehicle_confidences(self, results, detection_zone):
         # Classes we consider as "vehicles" (car, motorcycle, bus, truck)
         vehicle_classes = {2, 3, 5, 7}
 
-        # Load image using OpenCV
-        image = cv2.imread(image_path)
-        height, width = image.shape[:2]
-
-        # Define the lower half of the image as detection zone
-        detection_zone = (0, height // 2, width, height)
-
-        # Count vehicles in the detection zone
-        vehicle_count = 0
+        # Confidence of every vehicle whose bottom-center lies in the zone
+        confidences = []
 
         for result in results:
             for box in result.boxes:
@@ -49,10 +59,100 @@ class VehicleDetector:
 
                     # Check if bottom-center point is inside the lower half
                     if self.is_point_inside_box(bottom_center, detection_zone):
-                        vehicle_count += 1
+                        confidences.append(float(box.conf))
+
+        return confidences
+
+    def count_vehicles(self, results, detection_zone):
+        # Count vehicles in the detection zone that pass the confidence threshold
+        confidences = self.zone_vehicle_confidences(results, detection_zone)
+        return sum(1 for conf in confidences if conf >= self.conf_threshold)
+
+    def filter_results(self, results, min_conf):
+        # Keep only boxes at or above min_conf (Results support boolean indexing)
+        return [result[result.boxes.conf >= min_conf] for result in results]
+
+    def detect_with_cascade(self, image, detection_zone):
+        low = self.conf_threshold - self.ambiguity_margin
+        high = self.conf_threshold + self.ambiguity_margin
+
+        # Run the small model low enough to see boxes just under the threshold too
+        small_results = self.cascade_model(image, conf=low)
+        confidences = self.zone_vehicle_confidences(small_results, detection_zone)
+        small_count = sum(1 for conf in confidences if conf >= self.conf_threshold)
+
+        # Escalate when too many boxes sit near the threshold or the road is busy
+        ambiguous = sum(1 for conf in confidences if low <= conf < high) > self.max_ambiguous
+        busy = small_count >= self.escalation_count
+
+        self.cascade_stats['frames'] += 1
+
+        if ambiguous or busy:
+            self.cascade_stats['escalations'] += 1
+            results = self.detect_vehicles(image)
+            return results, self.count_vehicles(results, detection_zone)
+
+        # Periodically compare the small model's answer with the large model
+        self.cascade_stats['accepted'] += 1
+        if self.audit_every and self.cascade_stats['accepted'] % self.audit_every == 0:
+            large_count = self.count_vehicles(self.detect_vehicles(image), detection_zone)
+            difference = abs(large_count - small_count)
+            self.cascade_stats['audited'] += 1
+            self.cascade_stats['total_abs_difference'] += difference
+            self.cascade_stats['max_abs_difference'] = max(self.cascade_stats['max_abs_difference'], difference)
+
+        # Drop the below-threshold boxes so the results match the count
+        return self.filter_results(small_results, self.conf_threshold), small_count
+
+    def reset_cascade_stats(self):
+        # Counters for how the cascade behaved since the last reset
+        self.cascade_stats = {
+            'frames': 0,
+            'escalations': 0,
+            'accepted': 0,
+            'audited': 0,
+            'total_abs_difference': 0,
+            'max_abs_difference': 0,
+        }
+
+    def get_cascade_stats(self):
+        """
+        Summarize cascade behaviour since the last reset
+
+        Returns:
+            dict: Escalation rate and count difference against the large model.
+                  Escalated frames use the large model, so only accepted frames
+                  can differ; the mean difference is over audited frames, and
+                  both differences are None until a frame has been audited.
+        """
+        stats = dict(self.cascade_stats)
+        frames = stats['frames']
+        audited = stats['audited']
+
+        stats['escalation_rate'] = stats['escalations'] / frames if frames else 0.0
+        stats['mean_abs_difference'] = stats['total_abs_difference'] / audited if audited else None
+        if not audited:
+            stats['max_abs_difference'] = None
+        return stats
+
+    def detect_and_count_with_image(self, image):
+        # Image file path, or a BGR image (e.g. a video frame) used as-is
+        frame = image if hasattr(image, 'shape') else cv2.imread(str(image))
+        height, width = frame.shape[:2]
+
+        # Define the lower half of the image as detection zone
+        detection_zone = (0, height // 2, width, height)
+
+        # Run detection and count vehicles in the detection zone (on the
+        # already-decoded frame, so each model doesn't read the file again)
+        if self.cascade_model is None:
+            results = self.detect_vehicles(frame)
+            vehicle_count = self.count_vehicles(results, detection_zone)
+        else:
+            results, vehicle_count = self.detect_with_cascade(frame, detection_zone)
 
         # Draw a red line separating the upper and lower halves
-        annotated_image = image.copy()
+        annotated_image = frame.copy()
         cv2.rectangle(annotated_image, (0, height // 2), (width, height), (0, 0, 255), 2)
 
         # Convert BGR to RGB for display (if using matplotlib/streamlit)
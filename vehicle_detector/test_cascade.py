@@ -0,0 +1,142 @@
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("ultralytics")
+
+from vehicle_detector import detector as detector_module
+from vehicle_detector.detector import VehicleDetector
+
+# Lower half of a 100x100 image, as used by detect_and_count_with_image
+ZONE = (0, 50, 100, 100)
+
+
+class StubConf(list):
+    # Stands in for the boxes.conf tensor: comparison gives a boolean mask
+    def __ge__(self, threshold):
+        return [conf >= threshold for conf in self]
+
+
+class StubBox:
+    def __init__(self, conf, cls=2, xyxy=(10, 60, 30, 90)):
+        self.conf = conf
+        self.cls = cls
+        self.xyxy = [xyxy]
+
+
+class StubBoxes(list):
+    @property
+    def conf(self):
+        return StubConf(box.conf for box in self)
+
+
+class StubResult:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+    def __getitem__(self, mask):
+        # Boolean indexing, as on ultralytics Results
+        return StubResult(StubBoxes(box for box, keep in zip(self.boxes, mask) if keep))
+
+
+class StubModel:
+    # Returns fixed boxes, filtered by the conf argument like YOLO does
+    def __init__(self, confidences):
+        self.confidences = confidences
+        self.calls = 0
+        self.images = []
+
+    def __call__(self, image, conf):
+        self.calls += 1
+        self.images.append(image)
+        return [StubResult(StubBoxes(StubBox(c) for c in self.confidences if c >= conf))]
+
+
+def make_detector(monkeypatch, small, large, **kwargs):
+    models = {'large.pt': StubModel(large), 'small.pt': StubModel(small)}
+    monkeypatch.setattr(detector_module, 'YOLO', lambda weights: models[weights])
+    detector = VehicleDetector(model_weights='large.pt', cascade_weights='small.pt', **kwargs)
+    return detector, models['small.pt'], models['large.pt']
+
+
+def test_confident_frame_uses_small_model_only(monkeypatch):
+    detector, small, large = make_detector(monkeypatch, small=[0.9, 0.8, 0.38], large=[0.9, 0.8, 0.7])
+
+    results, count = detector.detect_with_cascade(None, ZONE)
+
+    assert count == 2
+    assert (small.calls, large.calls) == (1, 0)
+    # The single box just under the threshold is not returned with the counted ones
+    assert [box.conf for box in results[0].boxes] == [0.9, 0.8]
+    assert detector.get_cascade_stats()['escalation_rate'] == 0.0
+
+
+def test_several_boxes_near_threshold_escalate(monkeypatch):
+    detector, small, large = make_detector(monkeypatch, small=[0.9, 0.42, 0.37], large=[0.9, 0.8, 0.7])
+
+    _, count = detector.detect_with_cascade(None, ZONE)
+
+    assert count == 3
+    assert large.calls == 1
+    assert detector.get_cascade_stats()['escalations'] == 1
+
+
+def test_busy_road_escalates(monkeypatch):
+    detector, small, large = make_detector(monkeypatch, small=[0.9] * 3, large=[0.9] * 4, escalation_count=3)
+
+    _, count = detector.detect_with_cascade(None, ZONE)
+
+    assert count == 4
+    assert large.calls == 1
+
+
+def test_boxes_outside_zone_or_not_vehicles_are_ignored(monkeypatch):
+    detector, _, _ = make_detector(monkeypatch, small=[], large=[])
+    results = [StubResult(StubBoxes([StubBox(0.42, xyxy=(10, 0, 30, 20)), StubBox(0.41, cls=0)]))]
+
+    assert detector.zone_vehicle_confidences(results, ZONE) == []
+
+
+def test_audit_measures_difference_from_large_model(monkeypatch):
+    detector, small, large = make_detector(monkeypatch, small=[0.9], large=[0.9, 0.8, 0.7], audit_every=2)
+
+    for _ in range(4):
+        detector.detect_with_cascade(None, ZONE)
+
+    stats = detector.get_cascade_stats()
+    assert stats['frames'] == stats['accepted'] == 4
+    assert stats['audited'] == 2
+    assert large.calls == 2
+    assert stats['mean_abs_difference'] == 2.0
+    assert stats['max_abs_difference'] == 2
+
+
+def test_cascade_stats_rates_and_reset(monkeypatch):
+    detector, small, large = make_detector(monkeypatch, small=[0.9], large=[0.9])
+
+    assert detector.get_cascade_stats()['escalation_rate'] == 0.0
+    # Nothing audited yet: the drift is unknown, not zero
+    assert detector.get_cascade_stats()['mean_abs_difference'] is None
+    assert detector.get_cascade_stats()['max_abs_difference'] is None
+
+    detector.detect_with_cascade(None, ZONE)
+    small.confidences = [0.9] * 8
+    detector.detect_with_cascade(None, ZONE)
+
+    assert detector.get_cascade_stats()['escalation_rate'] == 0.5
+
+    detector.reset_cascade_stats()
+    assert detector.get_cascade_stats()['frames'] == 0
+
+
+def test_image_file_is_decoded_once_for_all_models(monkeypatch):
+    np = pytest.importorskip("numpy")
+    detector, small, large = make_detector(monkeypatch, small=[0.9, 0.42, 0.37], large=[0.9], audit_every=1)
+    frame = np.zeros((100, 100, 3), dtype=np.uint8)
+    reads = []
+    monkeypatch.setattr(detector_module.cv2, 'imread', lambda path: reads.append(path) or frame)
+
+    count, _, _ = detector.detect_and_count_with_image('road.jpg')
+
+    assert count == 1
+    assert reads == ['road.jpg']
+    assert all(image is frame for image in small.images + large.images)